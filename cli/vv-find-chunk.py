@@ -10,7 +10,7 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from vvproject import find_chunk
+from vvproject.project import find_chunk_by_timestamp, load_project
 
 
 def main() -> None:
@@ -23,7 +23,7 @@ def main() -> None:
     if not project_path.exists():
         raise SystemExit(f"Project file not found: {project_path}")
 
-    chunk = find_chunk(project_path, args.ts)
+    chunk = find_chunk_by_timestamp(load_project(project_path), args.ts)
     if chunk is None:
         raise SystemExit("No chunk covers the requested timestamp")
 
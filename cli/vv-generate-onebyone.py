@@ -35,6 +35,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--temperature", type=float, default=0.95, help="Sampling temperature")
     parser.add_argument("--top-p", type=float, default=0.95, help="Top-p sampling value")
     parser.add_argument("--max-words", type=int, default=80, help="Maximum words per chunk")
+    parser.add_argument("--batch-size", type=int, default=1, help="Similar-length chunks per model batch for real TTS (a batch uses its first chunk's seed; ignored with --mock)")
     parser.add_argument("--force", action="store_true", help="Overwrite an existing project directory")
     parser.add_argument("--mock", action="store_true", help="Force mock audio generation (use VV_MOCK_TTS env by default)")
     return parser.parse_args()
@@ -60,6 +61,7 @@ def main() -> None:
         attention_type=args.attention,
         global_seed=args.seed,
         crossfade_ms=args.xfade,
+        batch_size=args.batch_size,
     )
     tts_options = TTSOptions(
         cfg_scale=args.cfg,
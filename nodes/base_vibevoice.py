@@ -563,7 +563,8 @@ class BaseVibeVoiceNode:
             "VibeVoice-Large-Quant-4Bit": "DevParker/VibeVoice7b-low-vram"
         }
     
-    def _split_text_into_chunks(self, text: str, max_words: int = 250) -> List[str]:
+    @staticmethod
+    def _split_text_into_chunks(text: str, max_words: int = 250) -> List[str]:
         """Split long text into manageable chunks at sentence boundaries
         
         Args:
@@ -733,8 +734,23 @@ class BaseVibeVoiceNode:
     
     def _generate_with_vibevoice(self, formatted_text: str, voice_samples: List[np.ndarray], 
                                 cfg_scale: float, seed: int, diffusion_steps: int, use_sampling: bool,
-                                temperature: float = 0.95, top_p: float = 0.95) -> dict:
+                                temperature: float = 0.95, top_p: float = 0.95, to_host: bool = True) -> dict:
         """Generate audio using VibeVoice model"""
+        return self._generate_batch_with_vibevoice(
+            [formatted_text], voice_samples, cfg_scale, seed, diffusion_steps,
+            use_sampling, temperature, top_p, to_host=to_host,
+        )[0]
+    
+    def _generate_batch_with_vibevoice(self, formatted_texts: List[str], voice_samples: List[np.ndarray],
+                                      cfg_scale: float, seed: int, diffusion_steps: int, use_sampling: bool,
+                                      temperature: float = 0.95, top_p: float = 0.95,
+                                      to_host: bool = True) -> List[dict]:
+        """Generate audio for several prompts in one padded batch, one audio dict per prompt.
+        
+        All prompts share the voice samples, the seed and the generation parameters.
+        With ``to_host=False`` the waveforms stay on the model's device in its dtype,
+        for callers that post-process them there before copying to the host.
+        """
         try:
             # Ensure model and processor are loaded
             if self.model is None or self.processor is None:
@@ -769,9 +785,11 @@ class BaseVibeVoiceNode:
                     pass
             
             # Prepare inputs using processor
+            # The processor pads the prompts to a common length and returns the
+            # matching attention masks; generate() then tracks EOS per sample
             inputs = self.processor(
-                [formatted_text],  # Wrap text in list
-                voice_samples=[voice_samples], # Provide voice samples for reference
+                list(formatted_texts),
+                voice_samples=[voice_samples] * len(formatted_texts), # Same reference voice for every prompt
                 return_tensors="pt",
                 return_attention_mask=True
             )
@@ -781,7 +799,7 @@ class BaseVibeVoiceNode:
             inputs = {k: v.to(device) if isinstance(v, torch.Tensor) else v for k, v in inputs.items()}
             
             # Estimate tokens for user information (not used as limit)
-            text_length = len(formatted_text.split())
+            text_length = sum(len(text.split()) for text in formatted_texts)
             estimated_tokens = int(text_length * 2.5)  # More accurate estimate for display
             
             # Log generation start with explanation
@@ -835,23 +853,31 @@ class BaseVibeVoiceNode:
                 if hasattr(output, 'speech_outputs') and output.speech_outputs:
                     speech_tensors = output.speech_outputs
                     
-                    if isinstance(speech_tensors, list) and len(speech_tensors) > 0:
-                        audio_tensor = torch.cat(speech_tensors, dim=-1)
-                    else:
-                        audio_tensor = speech_tensors
-                    
-                    # Ensure proper format (1, 1, samples)
-                    if audio_tensor.dim() == 1:
-                        audio_tensor = audio_tensor.unsqueeze(0).unsqueeze(0)
-                    elif audio_tensor.dim() == 2:
-                        audio_tensor = audio_tensor.unsqueeze(0)
+                    # speech_outputs holds one tensor per prompt
+                    if not isinstance(speech_tensors, list):
+                        speech_tensors = [speech_tensors]
+                    elif len(formatted_texts) == 1:
+                        speech_tensors = [torch.cat(speech_tensors, dim=-1)]
+                    if len(speech_tensors) != len(formatted_texts) or any(t is None for t in speech_tensors):
+                        raise Exception("VibeVoice returned no audio for part of the batch")
                     
-                    # Convert to float32 for compatibility with downstream nodes (Save Audio, etc.)
-                    # Many audio processing nodes don't support BFloat16
-                    return {
-                        "waveform": audio_tensor.cpu().float(),
-                        "sample_rate": 24000
-                    }
+                    results = []
+                    for audio_tensor in speech_tensors:
+                        # Ensure proper format (1, 1, samples)
+                        if audio_tensor.dim() == 1:
+                            audio_tensor = audio_tensor.unsqueeze(0).unsqueeze(0)
+                        elif audio_tensor.dim() == 2:
+                            audio_tensor = audio_tensor.unsqueeze(0)
+                        
+                        # Convert to float32 for compatibility with downstream nodes (Save Audio, etc.)
+                        # Many audio processing nodes don't support BFloat16
+                        if to_host:
+                            audio_tensor = audio_tensor.cpu().float()
+                        results.append({
+                            "waveform": audio_tensor,
+                            "sample_rate": 24000
+                        })
+                    return results
                     
                 elif hasattr(output, 'sequences'):
                     logger.error("VibeVoice returned only text tokens, no audio generated")
@@ -1,4 +1,5 @@
-from .engine import TTSOptions, build_final_mix, find_chunk, generate_project, replace_chunk
+from typing import TYPE_CHECKING
+
 from .project import (
     ChunkData,
     ProjectData,
@@ -10,6 +11,23 @@ from .project import (
 )
 from .utils import ensure_folder_paths, is_mock_mode, load_script_text, resolve_repo_root
 
+if TYPE_CHECKING:
+    from .engine import TTSOptions, build_final_mix, find_chunk, generate_project, replace_chunk
+
+# The engine pulls in NumPy, soundfile and the VibeVoice node stack, so it is
+# only imported when one of its names is first accessed. Metadata-only callers
+# (project.json parsing, timestamp lookups) stay fast to start.
+_ENGINE_EXPORTS = {"TTSOptions", "build_final_mix", "find_chunk", "generate_project", "replace_chunk"}
+
+
+def __getattr__(name: str):
+    if name in _ENGINE_EXPORTS:
+        from . import engine
+
+        return getattr(engine, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "TTSOptions",
     "build_final_mix",
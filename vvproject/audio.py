@@ -1,28 +1,111 @@
 from __future__ import annotations
 
+import functools
 import math
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-import librosa
 import numpy as np
 import soundfile as sf
+import soxr
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; fall back to NumPy kernels
+    njit = prange = None
 
-def load_audio(path: Path, target_sample_rate: int) -> np.ndarray:
-    """Load an audio file as mono float32 data at ``target_sample_rate``."""
-    data, sr = sf.read(str(path), always_2d=False)
+
+def load_audio(path: Path, target_sample_rate: int, dtype: type = np.float32) -> np.ndarray:
+    """Load an audio file as mono data at ``target_sample_rate``.
+
+    ``dtype=np.int16`` keeps the raw PCM samples, halving memory for callers
+    that hold many chunks at once; the mixing helpers accept either form.
+    """
+    dtype = np.dtype(dtype)
+    data, sr = sf.read(str(path), dtype=dtype.name, always_2d=False)
     if data.ndim > 1:
         data = data[:, 0]
-    if sr != target_sample_rate:
-        data = librosa.resample(data, orig_sr=sr, target_sr=target_sample_rate)
-    return data.astype(np.float32)
+    data = resample_audio(data, sr, target_sample_rate)
+    return data.astype(dtype, copy=False)
+
+
+def resample_audio(data: np.ndarray, orig_sample_rate: int, target_sample_rate: int) -> np.ndarray:
+    """Resample mono ``data`` with soxr; returns ``data`` unchanged when rates match."""
+    if orig_sample_rate == target_sample_rate:
+        return data
+    return soxr.resample(data, orig_sample_rate, target_sample_rate, quality="HQ")
+
+
+# libsndfile issues many small writes while encoding; a large userspace buffer
+# coalesces them into a few big ones.
+_WRITE_BUFFER_BYTES = 10 * 1024 * 1024
 
 
 def write_flac(path: Path, data: np.ndarray, sample_rate: int) -> None:
-    """Write audio data to disk as FLAC, ensuring parent folders exist."""
+    """Write float or int16 audio data to disk as FLAC, ensuring parent folders exist."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb", buffering=_WRITE_BUFFER_BYTES) as fp:
+        sf.write(fp, data, sample_rate, subtype="PCM_16", format="FLAC")
+
+
+def write_flac_blocks(path: Path, blocks: Iterable[np.ndarray], sample_rate: int) -> None:
+    """Stream mono ``blocks`` into a FLAC file without holding the whole signal.
+
+    The file is encoded next to ``path`` and moved into place once complete,
+    so a failure part-way through leaves any previous file untouched.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
-    sf.write(str(path), data, sample_rate, subtype="PCM_16", format="FLAC")
+    partial = path.with_name(path.name + ".partial")
+    try:
+        with open(partial, "wb", buffering=_WRITE_BUFFER_BYTES) as fp, sf.SoundFile(
+            fp, mode="w", samplerate=sample_rate, channels=1, subtype="PCM_16", format="FLAC"
+        ) as handle:
+            for block in blocks:
+                handle.write(block)
+        os.replace(partial, path)
+    finally:
+        if partial.exists():
+            partial.unlink()
+
+
+_WRITE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vv-flac")
+
+
+def write_flac_async(path: Path, data: np.ndarray, sample_rate: int) -> Future:
+    """Encode ``data`` to FLAC on a background thread.
+
+    soundfile releases the GIL while encoding, so this overlaps with whatever
+    the caller does next. ``data`` must not be modified until the returned
+    future has completed.
+    """
+    return _WRITE_POOL.submit(write_flac, path, data, sample_rate)
+
+
+def synthesize_mock_speech(text: str, seed: int, sample_rate: int) -> np.ndarray:
+    """Deterministic placeholder audio used instead of TTS in mock mode."""
+    rng = np.random.default_rng(seed)
+    words = max(len(text.split()), 1)
+    duration = max(0.35, min(6.0, 0.28 * words))
+    num_samples = max(int(round(duration * sample_rate)), sample_rate // 4)
+    base_freq = 180.0 + (seed % 7) * 15.0
+
+    # Two float32 buffers, updated in place: the tone, then a scratch buffer
+    # holding the phase, the half-frequency tone and finally the noise.
+    scratch = np.arange(num_samples, dtype=np.float32)
+    scratch *= np.float32(2 * math.pi * base_freq * duration / num_samples)
+    waveform = np.sin(scratch)
+    waveform *= np.float32(0.18)
+    scratch *= np.float32(0.5)
+    np.sin(scratch, out=scratch)
+    scratch *= np.float32(0.08)
+    waveform += scratch
+    rng.standard_normal(dtype=np.float32, out=scratch)
+    scratch *= np.float32(0.05)
+    waveform += scratch
+    return waveform
 
 
 def calculate_duration_ms(data: np.ndarray, sample_rate: int) -> int:
@@ -32,52 +115,216 @@ def calculate_duration_ms(data: np.ndarray, sample_rate: int) -> int:
     return int(round(len(data) * 1000.0 / sample_rate))
 
 
+def _as_float32(data: np.ndarray) -> np.ndarray:
+    """Return ``data`` as float32 without copying when it already is.
+
+    int16 PCM is scaled to [-1, 1) the same way libsndfile does on read.
+    """
+    data = np.asarray(data)
+    if data.dtype == np.int16:
+        return np.multiply(data, np.float32(1.0 / 32768.0), dtype=np.float32)
+    return data.astype(np.float32, copy=False)
+
+
+def _mean_square(data: np.ndarray) -> float:
+    """Return the mean of ``data**2`` using a single BLAS dot product."""
+    # Flatten first: np.dot on 2-D input is a matrix product, not a sum of squares.
+    flat = data.reshape(-1)
+    if flat.size == 0:
+        return 0.0
+    return float(np.dot(flat, flat)) / flat.size
+
+
+def _lufs_from_mean_square(mean_square: float) -> float:
+    if mean_square <= 0.0:
+        return -80.0
+    return 20.0 * math.log10(math.sqrt(mean_square) + 1e-12)
+
+
 def rms_loudness_lufs(data: np.ndarray) -> float:
     """Approximate integrated loudness (LUFS) using RMS in dBFS."""
-    rms = math.sqrt(float(np.mean(np.square(data)))) if len(data) else 0.0
-    if rms <= 0.0:
-        return -80.0
-    return 20.0 * math.log10(rms + 1e-12)
+    return _lufs_from_mean_square(_mean_square(data))
+
+
+def match_loudness(data: np.ndarray, target_lufs: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Scale ``data`` so its RMS-based LUFS approximates ``target_lufs``.
+
+    Pass ``out=data`` to normalise in place when the caller owns the buffer.
+    """
+    data = _as_float32(data)
+    return apply_gain(data, loudness_gain(_mean_square(data), lufs_to_rms(target_lufs)), out=out)
 
 
-def match_loudness(data: np.ndarray, target_lufs: float) -> np.ndarray:
-    """Scale ``data`` so its RMS-based LUFS approximates ``target_lufs``."""
-    current = rms_loudness_lufs(data)
-    gain_db = target_lufs - current
-    gain = 10 ** (gain_db / 20.0)
-    adjusted = data * gain
-    return np.clip(adjusted, -1.0, 1.0)
+def lufs_to_rms(lufs: float) -> float:
+    """Convert an RMS-approximated LUFS level to a linear RMS amplitude."""
+    return 10 ** (lufs / 20.0)
+
+
+def loudness_gain(mean_square: float, target_rms: float) -> float:
+    """Return the linear gain that brings a signal of ``mean_square`` energy to ``target_rms``.
+
+    Equivalent to converting both levels to dB and back, without the log/pow
+    round trip; silence is treated as -80 dB like :func:`rms_loudness_lufs`.
+    """
+    rms = math.sqrt(mean_square) + 1e-12 if mean_square > 0.0 else 1e-4
+    return target_rms / rms
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True, nogil=True, parallel=True)
+    def _gain_clip_into(data, gain, out):
+        """Write ``data * gain`` clipped to [-1, 1] into ``out`` in a single pass."""
+        for i in prange(data.shape[0]):
+            out[i] = min(max(data[i] * gain, -1.0), 1.0)
+
+else:
+    _gain_clip_into = None
+
+
+def apply_gain(data: np.ndarray, gain: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Multiply ``data`` by ``gain`` and clip to [-1, 1] in one output buffer."""
+    if (
+        _gain_clip_into is not None
+        and data.ndim == 1
+        and data.dtype == np.float32
+        and (out is None or (out.dtype == np.float32 and out.shape == data.shape))
+    ):
+        if out is None:
+            out = np.empty_like(data)
+        _gain_clip_into(data, gain, out)
+        return out
+    adjusted = np.multiply(data, gain, out=out)
+    return np.clip(adjusted, -1.0, 1.0, out=adjusted)
+
+
+def _fade_curves(crossfade_samples: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the ``(fade_out, fade_in)`` half-cosine curves for an overlap."""
+    fade = np.linspace(0, math.pi / 2.0, crossfade_samples, endpoint=False, dtype=np.float32)
+    return np.square(np.cos(fade)), np.square(np.sin(fade))
+
+
+def _crossfade_into_numpy(
+    region: np.ndarray, head: np.ndarray, fade_out: np.ndarray, fade_in: np.ndarray
+) -> None:
+    region *= fade_out
+    region += head * fade_in
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True, nogil=True)
+    def _crossfade_into(region, head, fade_out, fade_in):
+        """Blend ``head`` into ``region`` in place: one fused multiply-add loop."""
+        for i in range(region.shape[0]):
+            region[i] = region[i] * fade_out[i] + head[i] * fade_in[i]
+
+else:
+    _crossfade_into = _crossfade_into_numpy
 
 
 def cosine_crossfade(first: np.ndarray, second: np.ndarray, crossfade_samples: int) -> np.ndarray:
     """Concatenate two signals with a half-cosine crossfade overlap."""
+    first = _as_float32(first)
+    second = _as_float32(second)
     if crossfade_samples <= 0 or len(first) == 0:
         return np.concatenate([first, second])
     crossfade_samples = min(crossfade_samples, len(first), len(second))
     if crossfade_samples == 0:
         return np.concatenate([first, second])
 
-    fade = np.linspace(0, math.pi / 2.0, crossfade_samples, endpoint=False)
-    fade_out = np.cos(fade) ** 2
-    fade_in = np.sin(fade) ** 2
-
-    overlap = first[-crossfade_samples:] * fade_out + second[:crossfade_samples] * fade_in
-    prefix = first[:-crossfade_samples]
-    suffix = second[crossfade_samples:]
-    return np.concatenate([prefix, overlap, suffix])
+    fade_out, fade_in = _fade_curves(crossfade_samples)
+    split = len(first) - crossfade_samples
+    result = np.empty(split + len(second), dtype=np.float32)
+    result[:len(first)] = first
+    _crossfade_into(result[split:len(first)], second[:crossfade_samples], fade_out, fade_in)
+    result[len(first):] = second[crossfade_samples:]
+    return result
 
 
 def stitch_chunks(chunk_audios: Iterable[np.ndarray], sample_rate: int, crossfade_ms: int) -> np.ndarray:
-    """Apply sequential crossfades across ``chunk_audios``."""
+    """Apply sequential crossfades across ``chunk_audios``.
+
+    The output buffer is allocated once and every chunk is written into it in
+    place, so stitching ``N`` chunks costs ``O(total samples)`` rather than
+    re-copying the growing mix for each boundary.
+    """
     chunk_list = list(chunk_audios)
     if not chunk_list:
         return np.zeros(0, dtype=np.float32)
 
-    result = chunk_list[0]
-    crossfade_samples = int(round(sample_rate * crossfade_ms / 1000.0))
+    crossfade_samples = max(int(round(sample_rate * crossfade_ms / 1000.0)), 0)
+
+    # Resolve every overlap up front so the final length is known before writing.
+    overlaps: List[int] = []
+    written = len(chunk_list[0])
     for chunk in chunk_list[1:]:
-        result = cosine_crossfade(result, chunk, crossfade_samples)
-    return result
+        overlap = min(crossfade_samples, written, len(chunk))
+        overlaps.append(overlap)
+        written += len(chunk) - overlap
+
+    out = np.empty(written, dtype=np.float32)
+    curves: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+    cursor = len(chunk_list[0])
+    out[:cursor] = _as_float32(chunk_list[0])
+    for chunk, overlap in zip(chunk_list[1:], overlaps):
+        chunk = _as_float32(chunk)
+        if overlap:
+            if overlap not in curves:
+                curves[overlap] = _fade_curves(overlap)
+            fade_out, fade_in = curves[overlap]
+            _crossfade_into(out[cursor - overlap : cursor], chunk[:overlap], fade_out, fade_in)
+        end = cursor + len(chunk) - overlap
+        out[cursor:end] = chunk[overlap:]
+        cursor = end
+    return out
+
+
+def iter_stitched_blocks(
+    chunk_audios: Iterable[np.ndarray], sample_rate: int, crossfade_ms: int
+) -> Iterator[np.ndarray]:
+    """Yield the stitched mix of ``chunk_audios`` as consecutive float32 blocks.
+
+    Produces the same samples as :func:`stitch_chunks`, but only the last
+    ``crossfade_ms`` of output is held back for the next overlap. Peak memory
+    is one chunk plus that tail, however long the project is. Every yielded
+    block is a fresh array the caller may modify in place.
+    """
+    crossfade_samples = max(int(round(sample_rate * crossfade_ms / 1000.0)), 0)
+    curves: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+    tail = np.zeros(0, dtype=np.float32)
+    written = 0
+    started = False
+    for chunk in chunk_audios:
+        chunk = _as_float32(chunk)
+        overlap = min(crossfade_samples, written, len(chunk)) if started else 0
+        if overlap:
+            if overlap not in curves:
+                curves[overlap] = _fade_curves(overlap)
+            fade_out, fade_in = curves[overlap]
+            _crossfade_into(tail[len(tail) - overlap :], chunk[:overlap], fade_out, fade_in)
+        buffer = np.concatenate([tail, chunk[overlap:]])
+        written += len(chunk) - overlap
+        started = True
+
+        keep = min(crossfade_samples, len(buffer))
+        if len(buffer) > keep:
+            yield buffer[: len(buffer) - keep]
+        tail = buffer[len(buffer) - keep :]
+    if len(tail):
+        yield tail
+
+
+@functools.lru_cache(maxsize=1)
+def _rubberband_backend():
+    """Return ``pyrubberband`` when it and the ``rubberband`` CLI are usable."""
+    try:
+        import pyrubberband
+    except ImportError:
+        return None
+    if shutil.which("rubberband") is None:
+        return None
+    return pyrubberband
 
 
 def time_stretch_to_duration(data: np.ndarray, sample_rate: int, target_duration_ms: int) -> np.ndarray:
@@ -91,11 +338,16 @@ def time_stretch_to_duration(data: np.ndarray, sample_rate: int, target_duration
 
     desired_samples = max(int(round(target_duration_ms * sample_rate / 1000.0)), 1)
     rate = current_duration_ms / float(target_duration_ms)
-    stretched = librosa.effects.time_stretch(data, rate=rate)
 
-    if len(stretched) > desired_samples:
-        stretched = stretched[:desired_samples]
-    elif len(stretched) < desired_samples:
-        stretched = np.pad(stretched, (0, desired_samples - len(stretched)))
+    pyrb = _rubberband_backend()
+    if pyrb is not None:
+        stretched = pyrb.time_stretch(data, sample_rate, rate)
+    else:
+        import librosa
+
+        stretched = librosa.effects.time_stretch(data, rate=rate)
 
-    return stretched.astype(np.float32)
+    result = np.zeros(desired_samples, dtype=np.float32)
+    filled = min(len(stretched), desired_samples)
+    result[:filled] = stretched[:filled]
+    return result
@@ -1,22 +1,30 @@
 from __future__ import annotations
 
+import errno
 import logging
-import math
+import os
 import shutil
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
 from . import utils
 from .audio import (
+    apply_gain,
     calculate_duration_ms,
+    iter_stitched_blocks,
     load_audio,
-    match_loudness,
-    stitch_chunks,
+    loudness_gain,
+    resample_audio,
+    synthesize_mock_speech,
     time_stretch_to_duration,
     write_flac,
+    write_flac_async,
+    write_flac_blocks,
 )
 from .project import (
     ChunkData,
@@ -28,9 +36,6 @@ from .project import (
     save_project,
 )
 
-utils.ensure_folder_paths()
-from nodes.base_vibevoice import BaseVibeVoiceNode  # noqa: E402
-
 
 LOGGER = logging.getLogger("VibeVoice.Project")
 
@@ -53,33 +58,58 @@ class TTSOptions:
         }
 
 
-class ChunkRenderer(BaseVibeVoiceNode):
+def _base_node_class():
+    # The node module pulls in torch and transformers, so it is only imported
+    # once something needs the model or its text splitter; read-only helpers
+    # such as find_chunk and build_final_mix stay cheap to import.
+    utils.ensure_folder_paths()
+    from nodes.base_vibevoice import BaseVibeVoiceNode
+
+    return BaseVibeVoiceNode
+
+
+def _format_prompt(text: str) -> str:
+    # Single-speaker specialisation of BaseVibeVoiceNode._format_text_for_vibevoice:
+    # collapse all whitespace (newlines included) and prefix the speaker tag.
+    return "Speaker 1: " + " ".join(text.split())
+
+
+class ChunkRenderer:
     """Thin wrapper around ``BaseVibeVoiceNode`` for chunk-level rendering."""
 
     def __init__(self, settings: ProjectSettings, options: TTSOptions, mock: bool = False):
-        super().__init__()
         self.settings = settings
         self.options = options
         self.mock = mock
+        self._node = None if mock else _base_node_class()()
         self._voice_samples = None
         self._speakers = ["Speaker 1"]
+        self._base_params = options.as_dict()
+        self._ready = False
 
     def _ensure_ready(self) -> None:
         if self.mock:
             return
-        model_map = self._get_model_mapping()
+        node = self._node
+        # Once loaded, skip the model-map lookup and load_model call per chunk;
+        # re-enter only if the node's model has since been freed.
+        if self._ready and node.model is not None:
+            return
+        model_map = node._get_model_mapping()
         model_path = model_map.get(self.settings.model_name, self.settings.model_name)
-        self.load_model(self.settings.model_name, model_path, self.settings.attention_type)
+        node.load_model(self.settings.model_name, model_path, self.settings.attention_type)
         if self._voice_samples is None:
-            self._voice_samples = self._prepare_voice_samples(self._speakers, None)
+            self._voice_samples = node._prepare_voice_samples(self._speakers, None)
+        self._ready = True
 
     def render_text(self, text: str, seed: int, overrides: Optional[Dict[str, object]] = None) -> np.ndarray:
         if self.mock:
             return self._render_mock(text, seed)
 
         self._ensure_ready()
-        params = self.options.as_dict()
+        params = self._base_params
         if overrides:
+            params = dict(params)
             for key, value in overrides.items():
                 if value is not None and key in params:
                     if key == "use_sampling":
@@ -89,9 +119,8 @@ class ChunkRenderer(BaseVibeVoiceNode):
                     else:
                         params[key] = float(value)
 
-        formatted = self._format_text_for_vibevoice(text, self._speakers)
-        audio_dict = self._generate_with_vibevoice(
-            formatted,
+        audio_dict = self._node._generate_with_vibevoice(
+            _format_prompt(text),
             self._voice_samples,
             params["cfg_scale"],
             seed,
@@ -99,13 +128,54 @@ class ChunkRenderer(BaseVibeVoiceNode):
             params["use_sampling"],
             params["temperature"],
             params["top_p"],
+            to_host=False,
         )
 
         waveform = audio_dict.get("waveform")
         sample_rate = audio_dict.get("sample_rate", self.settings.sample_rate)
+        return self._to_output_audio(waveform, sample_rate)
+
+    def render_batch(self, texts: Sequence[str], seed: int) -> List[np.ndarray]:
+        """Render ``texts`` through the model as one padded batch seeded with ``seed``.
 
+        The batch shares the base params, so a batched chunk does not reproduce
+        its standalone ``render_text`` output bit for bit.
+        """
+        if self.mock or len(texts) == 1:
+            return [self.render_text(text, seed) for text in texts]
+
+        self._ensure_ready()
+        params = self._base_params
+        audio_dicts = self._node._generate_batch_with_vibevoice(
+            [_format_prompt(text) for text in texts],
+            self._voice_samples,
+            params["cfg_scale"],
+            seed,
+            params["diffusion_steps"],
+            params["use_sampling"],
+            params["temperature"],
+            params["top_p"],
+            to_host=False,
+        )
+        return [
+            self._to_output_audio(
+                audio_dict.get("waveform"), audio_dict.get("sample_rate", self.settings.sample_rate)
+            )
+            for audio_dict in audio_dicts
+        ]
+
+    def _to_output_audio(self, waveform: Any, sample_rate: int) -> np.ndarray:
         if hasattr(waveform, "detach"):
-            waveform = waveform.detach().cpu().float().numpy()
+            waveform = waveform.detach()
+            # The node leaves the waveform on the model's device (to_host=False).
+            if waveform.is_cuda and sample_rate != self.settings.sample_rate:
+                # Resample while still on the GPU so only target-rate samples
+                # cross to the host; the CPU resample below then is a no-op.
+                import torchaudio.functional as taF
+
+                waveform = taF.resample(waveform.float(), sample_rate, self.settings.sample_rate)
+                sample_rate = self.settings.sample_rate
+            waveform = waveform.cpu().float().numpy()
 
         if isinstance(waveform, np.ndarray):
             if waveform.ndim == 3:
@@ -117,40 +187,56 @@ class ChunkRenderer(BaseVibeVoiceNode):
         else:
             data = np.asarray(waveform, dtype=np.float32)
 
-        if sample_rate != self.settings.sample_rate:
-            import librosa
-
-            data = librosa.resample(data, orig_sr=sample_rate, target_sr=self.settings.sample_rate)
-
-        return data.astype(np.float32)
+        data = np.asarray(data, dtype=np.float32)
+        return resample_audio(data, sample_rate, self.settings.sample_rate)
 
     def _render_mock(self, text: str, seed: int) -> np.ndarray:
-        rng = np.random.default_rng(seed)
-        words = max(len(text.split()), 1)
-        duration = max(0.35, min(6.0, 0.28 * words))
-        num_samples = max(int(round(duration * self.settings.sample_rate)), self.settings.sample_rate // 4)
-        t = np.linspace(0.0, duration, num_samples, endpoint=False)
-        base_freq = 180.0 + (seed % 7) * 15.0
-        waveform = 0.18 * np.sin(2 * math.pi * base_freq * t)
-        waveform += 0.08 * np.sin(2 * math.pi * (base_freq * 0.5) * t)
-        waveform += 0.05 * rng.standard_normal(num_samples)
-        return waveform.astype(np.float32)
+        return synthesize_mock_speech(text, seed, self.settings.sample_rate)
+
+
+def _ordered_results(
+    pool: Executor, fn: Callable[..., Any], jobs: Iterable[Tuple[Any, ...]], window: int
+) -> Iterator[Any]:
+    """Run ``fn(*job)`` for each job on ``pool`` and yield results in job order.
+
+    At most ``window`` jobs are in flight, which bounds memory while keeping
+    every worker busy.
+    """
+    pending: Deque[Future] = deque()
+    remaining = iter(jobs)
+    for job in remaining:
+        pending.append(pool.submit(fn, *job))
+        if len(pending) >= window:
+            break
+    while pending:
+        result = pending.popleft().result()
+        for job in remaining:
+            pending.append(pool.submit(fn, *job))
+            break
+        yield result
 
 
 def _chunk_script(script_text: str, max_words: int) -> List[Tuple[str, int, int]]:
-    helper = BaseVibeVoiceNode()
-    raw_chunks = helper._split_text_into_chunks(script_text, max_words)
+    raw_chunks = _base_node_class()._split_text_into_chunks(script_text, max_words)
     positions: List[Tuple[str, int, int]] = []
     cursor = 0
+    length = len(script_text)
     for raw in raw_chunks:
         chunk_text = raw.strip()
         if not chunk_text:
             continue
-        index = script_text.find(chunk_text, cursor)
-        if index == -1:
-            index = script_text.find(chunk_text)
-        if index == -1:
-            index = cursor
+        # Chunks come back in script order, so the next one normally starts
+        # right after the whitespace following the previous chunk; only fall
+        # back to searching when the splitter rewrote the text.
+        index = cursor
+        while index < length and script_text[index].isspace():
+            index += 1
+        if not script_text.startswith(chunk_text, index):
+            index = script_text.find(chunk_text, cursor)
+            if index == -1:
+                index = script_text.find(chunk_text)
+            if index == -1:
+                index = cursor
         start = index
         end = start + len(chunk_text)
         positions.append((chunk_text, start, end))
@@ -158,6 +244,22 @@ def _chunk_script(script_text: str, max_words: int) -> List[Tuple[str, int, int]
     return positions
 
 
+def _length_buckets(lengths: Sequence[int], batch_size: int, tolerance: float = 0.2) -> List[range]:
+    # Runs of consecutive chunks, at most ``batch_size`` long, whose lengths stay
+    # within ``tolerance`` of the run's first chunk, bounding padding per batch.
+    buckets: List[range] = []
+    start = 0
+    for end in range(1, len(lengths) + 1):
+        if (
+            end == len(lengths)
+            or end - start >= batch_size
+            or abs(lengths[end] - lengths[start]) > tolerance * lengths[start]
+        ):
+            buckets.append(range(start, end))
+            start = end
+    return buckets
+
+
 def _default_tts_options(settings: ProjectSettings) -> TTSOptions:
     defaults = settings.default_params or {}
     return TTSOptions(
@@ -176,10 +278,25 @@ def _archive_chunk(project: ProjectData, chunk: ChunkData) -> Optional[Path]:
     archive_dir = project.archive_directory
     archive_dir.mkdir(parents=True, exist_ok=True)
     stem = source.stem
-    existing = sorted(archive_dir.glob(f"{stem}__v*.flac"))
-    version = len(existing) + 1
+    prefix = f"{stem}__v"
+    # One scandir pass, no per-entry stat or sort. Numbering continues from
+    # the highest existing version so a pruned archive never gets overwritten.
+    version = 1
+    with os.scandir(archive_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith(prefix) and name.endswith(".flac"):
+                number = name[len(prefix) : -len(".flac")]
+                if number.isdigit():
+                    version = max(version, int(number) + 1)
     destination = archive_dir / f"{stem}__v{version}.flac"
-    shutil.move(str(source), destination)
+    try:
+        # Archive and chunks normally share a filesystem: a plain atomic rename.
+        os.replace(source, destination)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        shutil.move(source, destination)
     return destination
 
 
@@ -190,7 +307,14 @@ def generate_project(
     tts_options: TTSOptions,
     max_words_per_chunk: int,
     mock: bool = False,
+    save_every: int = 10,
 ) -> ProjectData:
+    """Render ``script_text`` chunk by chunk into a new project at ``project_root``.
+
+    ``project.json`` is checkpointed every ``save_every`` chunks (0 disables
+    intermediate saves) and always once generation stops, including on error,
+    so an interrupted run leaves a loadable project behind.
+    """
     project_root.mkdir(parents=True, exist_ok=True)
     settings.default_params = tts_options.as_dict()
     project = ProjectData(root=project_root, settings=settings, chunks=[])
@@ -203,32 +327,100 @@ def generate_project(
     if not chunk_specs:
         raise ValueError("No chunks produced from script text")
 
-    next_start = 0
-    for idx, (chunk_text, char_start, char_end) in enumerate(chunk_specs, start=1):
-        seed = settings.global_seed + idx - 1
-        audio = renderer.render_text(chunk_text, seed)
-        duration_ms = calculate_duration_ms(audio, settings.sample_rate)
-        filename = f"chunk_{idx:03d}.flac"
-        chunk_path = project.chunks_directory / filename
-        write_flac(chunk_path, audio, settings.sample_rate)
-
-        chunk = ChunkData(
-            index=idx,
-            filename=filename,
-            text=chunk_text,
-            char_start=char_start,
-            char_end=char_end,
-            t_start_ms=int(round(next_start)),
-            duration_ms=duration_ms,
-            seed=seed,
-            params=tts_options.as_dict(),
+    seeds = [settings.global_seed + offset for offset in range(len(chunk_specs))]
+    render_pool: Optional[Executor] = None
+    cpus = os.cpu_count() or 1
+    if mock and cpus > 1 and len(chunk_specs) >= 2 * cpus:
+        # Mock chunks are independent and CPU-bound, so long scripts render in
+        # worker processes; below a couple of chunks per core, pool start-up
+        # costs more than it saves. Real TTS stays in-process: a single loaded
+        # model and CUDA context cannot be shared across processes.
+        workers = cpus
+        render_pool = ProcessPoolExecutor(max_workers=workers)
+        jobs = ((text, seed, settings.sample_rate) for (text, _, _), seed in zip(chunk_specs, seeds))
+        renders: Iterator[np.ndarray] = _ordered_results(
+            render_pool, synthesize_mock_speech, jobs, workers * 2
         )
-        project.add_chunk(chunk)
-        next_start = chunk.t_start_ms + chunk.duration_ms - settings.crossfade_ms
-        if next_start < 0:
-            next_start = 0
-        save_project(project)
+    else:
+        # TTS runs on one background thread while this thread encodes, saves
+        # and lays out the timeline. A single thread, because the model's
+        # diffusion scheduler keeps per-call state and cannot serve concurrent
+        # generate() calls. Results are consumed strictly in chunk order so
+        # offsets stay deterministic.
+        renderer._ensure_ready()
+        workers = 1
+        render_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vv-render")
+        # Batching only applies to real TTS; mock audio renders per chunk with
+        # its own seed, so mock projects do not depend on batch_size.
+        batch_size = max(int(settings.batch_size), 1)
+        if batch_size > 1 and not mock:
+            buckets = _length_buckets([len(text) for text, _, _ in chunk_specs], batch_size)
+            # A batch renders with its first chunk's seed; record that seed on
+            # every chunk in it so project.json reflects what was actually used.
+            for bucket in buckets:
+                for i in bucket:
+                    seeds[i] = seeds[bucket[0]]
+            batch_jobs = (([chunk_specs[i][0] for i in bucket], seeds[bucket[0]]) for bucket in buckets)
+            batches = _ordered_results(render_pool, renderer.render_batch, batch_jobs, workers)
+            renders = (audio for batch in batches for audio in batch)
+        else:
+            jobs = ((text, seed) for (text, _, _), seed in zip(chunk_specs, seeds))
+            renders = _ordered_results(render_pool, renderer.render_text, jobs, workers)
 
+    next_start = 0
+    # Rendered chunks waiting on their FLAC encode. A chunk joins the project
+    # only once its write has succeeded, so project.json never lists a chunk
+    # whose file is missing; a failed write is raised by the next check and
+    # stops rendering.
+    pending_writes: Deque[Tuple[Future, ChunkData]] = deque()
+
+    def commit_writes(block: bool) -> None:
+        while pending_writes and (block or pending_writes[0][0].done()):
+            future, chunk = pending_writes[0]
+            future.result()
+            pending_writes.popleft()
+            project.add_chunk(chunk)
+
+    try:
+        for idx, (chunk_text, char_start, char_end) in enumerate(chunk_specs, start=1):
+            seed = seeds[idx - 1]
+            audio = next(renders)
+            duration_ms = calculate_duration_ms(audio, settings.sample_rate)
+            filename = f"chunk_{idx:03d}.flac"
+            chunk_path = project.chunks_directory / filename
+
+            chunk = ChunkData(
+                index=idx,
+                filename=filename,
+                text=chunk_text,
+                char_start=char_start,
+                char_end=char_end,
+                t_start_ms=int(round(next_start)),
+                duration_ms=duration_ms,
+                seed=seed,
+                params=tts_options.as_dict(),
+            )
+            pending_writes.append((write_flac_async(chunk_path, audio, settings.sample_rate), chunk))
+            commit_writes(block=False)
+            next_start = chunk.t_start_ms + chunk.duration_ms - settings.crossfade_ms
+            if next_start < 0:
+                next_start = 0
+            if save_every > 0 and idx % save_every == 0 and idx < len(chunk_specs):
+                commit_writes(block=True)
+                save_project(project)
+    finally:
+        if render_pool is not None:
+            render_pool.shutdown(cancel_futures=True)
+        wait([future for future, _ in pending_writes])
+        # Keep the chunks written before the first failure, so the saved
+        # timeline has no gaps.
+        while pending_writes and pending_writes[0][0].exception() is None:
+            project.add_chunk(pending_writes.popleft()[1])
+        # Only this last save is fsynced; checkpoints rely on the atomic rename.
+        save_project(project, fsync=True)
+
+    # Re-raise a write failure that surfaced after the last render.
+    commit_writes(block=True)
     return project
 
 
@@ -293,18 +485,64 @@ def replace_chunk(
     return chunk
 
 
+def _iter_chunk_audio(
+    paths: Sequence[Union[str, Path]], sample_rate: int, dtype: type = np.float32
+) -> Iterator[np.ndarray]:
+    """Yield decoded chunk audio in order, decoding ahead on a thread pool.
+
+    soundfile releases the GIL while decoding, so a few chunks are decoded in
+    parallel while the caller consumes the current one.
+    """
+    if not paths:
+        return
+    # Never more threads than chunks: short projects skip idle worker startup.
+    workers = min(8, os.cpu_count() or 1, len(paths))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vv-load") as pool:
+        jobs = ((path, sample_rate, dtype) for path in paths)
+        yield from _ordered_results(pool, load_audio, jobs, workers)
+
+
 def build_final_mix(project_path: Path) -> Path:
     project = load_project(project_path)
-    chunk_audios: List[np.ndarray] = []
+    chunks_directory = project.chunks_directory
+    # One directory read instead of a stat per chunk; only names missing from
+    # the listing (e.g. nested filenames) fall back to a stat.
+    try:
+        with os.scandir(chunks_directory) as entries:
+            present = {entry.name: entry.path for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        present = {}
+    chunk_paths: List[Union[str, Path]] = []
     for chunk in project.chunks:
-        path = project.chunks_directory / chunk.filename
-        if not path.exists():
-            raise FileNotFoundError(f"Missing chunk audio: {path}")
-        chunk_audios.append(load_audio(path, project.settings.sample_rate))
-
-    combined = stitch_chunks(chunk_audios, project.settings.sample_rate, project.settings.crossfade_ms)
-    normalised = match_loudness(combined, project.settings.loudness_lufs)
-    write_flac(project.final_mix_path, normalised, project.settings.sample_rate)
+        path = present.get(chunk.filename)
+        if path is None:
+            path = chunks_directory / chunk.filename
+            if not path.is_file():
+                raise FileNotFoundError(f"Missing chunk audio: {path}")
+        chunk_paths.append(path)
+
+    sample_rate = project.settings.sample_rate
+    crossfade_ms = project.settings.crossfade_ms
+
+    def stitched_blocks() -> Iterator[np.ndarray]:
+        # Chunks are stored as PCM_16, so decoding them as int16 halves the
+        # memory of the chunks in flight.
+        chunk_audios = _iter_chunk_audio(chunk_paths, sample_rate, np.int16)
+        return iter_stitched_blocks(chunk_audios, sample_rate, crossfade_ms)
+
+    # Two streaming passes keep peak memory at roughly one chunk: the first
+    # measures the mix energy, the second applies the loudness gain and
+    # encodes the final mix block by block.
+    energy = 0.0
+    total_samples = 0
+    for block in stitched_blocks():
+        energy += float(np.dot(block, block))
+        total_samples += len(block)
+    mean_square = energy / total_samples if total_samples else 0.0
+    gain = loudness_gain(mean_square, project.settings.target_rms)
+
+    normalised = (apply_gain(block, gain, out=block) for block in stitched_blocks())
+    write_flac_blocks(project.final_mix_path, normalised, sample_rate)
     return project.final_mix_path
 
 
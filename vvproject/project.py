@@ -1,12 +1,31 @@
 from __future__ import annotations
 
 import json
+import os
+import sys
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; stdlib json is the fallback
+    orjson = None
 
-@dataclass
+# Parsed project.json payloads keyed by path, tagged with (mtime_ns, size) so an
+# edit on disk invalidates the entry. Objects are rebuilt per load, so callers
+# are free to mutate the returned ProjectData. Only the most recently used few
+# projects are kept, so a long-running ComfyUI server does not accumulate them.
+_PAYLOAD_CACHE: "OrderedDict[Path, Tuple[int, int, Dict[str, object]]]" = OrderedDict()
+_PAYLOAD_CACHE_SIZE = 4
+
+# Slotted instances drop the per-object __dict__, which adds up for projects
+# with thousands of chunks. ``slots`` needs Python 3.10+.
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class ProjectSettings:
     sample_rate: int
     loudness_lufs: float
@@ -17,6 +36,15 @@ class ProjectSettings:
     chunks_dir: str = "chunks"
     final_mix: str = "final_mix.flac"
     default_params: Dict[str, object] = field(default_factory=dict)
+    # Similar-length consecutive chunks rendered per padded model batch (real TTS
+    # only; mock rendering ignores it). Above 1, each batch renders with its first
+    # chunk's seed, which is the seed recorded for every chunk in it.
+    batch_size: int = 1
+
+    @property
+    def target_rms(self) -> float:
+        # Linear RMS amplitude for ``loudness_lufs``, used for loudness matching.
+        return 10 ** (self.loudness_lufs / 20.0)
 
     def to_dict(self) -> Dict[str, object]:
         data: Dict[str, object] = {
@@ -31,6 +59,8 @@ class ProjectSettings:
         }
         if self.default_params:
             data["default_params"] = self.default_params
+        if self.batch_size != 1:
+            data["batch_size"] = self.batch_size
         return data
 
     @classmethod
@@ -46,10 +76,11 @@ class ProjectSettings:
             chunks_dir=str(payload.get("chunks_dir", "chunks")),
             final_mix=str(payload.get("final_mix", "final_mix.flac")),
             default_params=dict(default_params),
+            batch_size=int(payload.get("batch_size", 1)),
         )
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ChunkData:
     index: int
     filename: str
@@ -78,25 +109,33 @@ class ChunkData:
 
     @classmethod
     def from_dict(cls, payload: Dict[str, object]) -> "ChunkData":
+        get = payload.get
         return cls(
             index=int(payload["index"]),
             filename=str(payload["filename"]),
-            text=str(payload.get("text", "")),
-            char_start=int(payload.get("char_start", 0)),
-            char_end=int(payload.get("char_end", 0)),
-            t_start_ms=int(payload.get("t_start_ms", 0)),
-            duration_ms=int(payload.get("duration_ms", 0)),
-            seed=int(payload.get("seed", 0)),
-            params=dict(payload.get("params", {})),
-            speaker_id=int(payload.get("speaker_id", 0)),
+            text=str(get("text", "")),
+            char_start=int(get("char_start", 0)),
+            char_end=int(get("char_end", 0)),
+            t_start_ms=int(get("t_start_ms", 0)),
+            duration_ms=int(get("duration_ms", 0)),
+            seed=int(get("seed", 0)),
+            params=dict(get("params", {})),
+            speaker_id=int(get("speaker_id", 0)),
         )
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ProjectData:
     root: Path
     settings: ProjectSettings
     chunks: List[ChunkData] = field(default_factory=list)
+    _by_index: Dict[int, ChunkData] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # ``chunks`` is kept sorted by index, so nothing downstream re-sorts it.
+        self.chunks.sort(key=lambda c: c.index)
+        for chunk in self.chunks:
+            self._by_index.setdefault(chunk.index, chunk)
 
     @property
     def project_json_path(self) -> Path:
@@ -117,43 +156,77 @@ class ProjectData:
     def to_dict(self) -> Dict[str, object]:
         return {
             "project": self.settings.to_dict(),
-            "chunks": [chunk.to_dict() for chunk in sorted(self.chunks, key=lambda c: c.index)],
+            "chunks": [chunk.to_dict() for chunk in self.chunks],
         }
 
     def get_chunk(self, index: int) -> Optional[ChunkData]:
-        for chunk in self.chunks:
-            if chunk.index == index:
-                return chunk
-        return None
+        return self._by_index.get(index)
 
     def add_chunk(self, chunk: ChunkData) -> None:
-        existing = self.get_chunk(chunk.index)
+        existing = self._by_index.get(chunk.index)
         if existing:
             self.chunks.remove(existing)
-        self.chunks.append(chunk)
-        self.chunks.sort(key=lambda c: c.index)
+        self._by_index[chunk.index] = chunk
+        if self.chunks and chunk.index < self.chunks[-1].index:
+            self.chunks.append(chunk)
+            self.chunks.sort(key=lambda c: c.index)
+        else:
+            self.chunks.append(chunk)
 
 
-def save_project(project: ProjectData, path: Optional[Path] = None) -> None:
+def save_project(project: ProjectData, path: Optional[Path] = None, fsync: bool = False) -> None:
     target = path or project.project_json_path
     target.parent.mkdir(parents=True, exist_ok=True)
-    with target.open("w", encoding="utf-8") as fp:
-        json.dump(project.to_dict(), fp, indent=2)
+    _PAYLOAD_CACHE.pop(target, None)
+    # Write a sibling file and rename it over the target so a crash mid-write
+    # never leaves a truncated project.json behind. ``fsync`` flushes both the
+    # file and, after the rename, its directory, for saves that must survive
+    # power loss.
+    partial = target.with_name(target.name + ".tmp")
+    with partial.open("wb") as fp:
+        if orjson is not None:
+            fp.write(orjson.dumps(project.to_dict(), option=orjson.OPT_INDENT_2))
+        else:
+            fp.write(json.dumps(project.to_dict(), indent=2).encode("utf-8"))
+        if fsync:
+            fp.flush()
+            os.fsync(fp.fileno())
+    os.replace(partial, target)
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        # Persist the rename itself (POSIX; directories cannot be opened on Windows).
+        dir_fd = os.open(target.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _read_payload(path: Path) -> Dict[str, object]:
+    # Popped up front so a stale, unreadable or deleted file leaves no entry.
+    cached = _PAYLOAD_CACHE.pop(path, None)
+    stat = os.stat(path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        _PAYLOAD_CACHE[path] = cached
+        return cached[2]
+    raw = path.read_bytes()
+    payload = orjson.loads(raw) if orjson is not None else json.loads(raw.decode("utf-8"))
+    _PAYLOAD_CACHE[path] = (stat.st_mtime_ns, stat.st_size, payload)
+    while len(_PAYLOAD_CACHE) > _PAYLOAD_CACHE_SIZE:
+        _PAYLOAD_CACHE.popitem(last=False)
+    return payload
 
 
 def load_project(path: Path) -> ProjectData:
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload = _read_payload(path)
     root = path.parent
     settings = ProjectSettings.from_dict(payload.get("project", {}))
     chunks = [ChunkData.from_dict(entry) for entry in payload.get("chunks", [])]
-    project = ProjectData(root=root, settings=settings, chunks=chunks)
-    project.chunks.sort(key=lambda c: c.index)
-    return project
+    return ProjectData(root=root, settings=settings, chunks=chunks)
 
 
 def recalculate_timeline(project: ProjectData) -> None:
     current_start = 0
-    for chunk in sorted(project.chunks, key=lambda c: c.index):
+    for chunk in project.chunks:
         chunk.t_start_ms = max(int(round(current_start)), 0)
         current_start = chunk.t_start_ms + chunk.duration_ms - project.settings.crossfade_ms
         if current_start < 0:
@@ -161,7 +234,7 @@ def recalculate_timeline(project: ProjectData) -> None:
 
 
 def find_chunk_by_timestamp(project: ProjectData, timestamp_ms: int) -> Optional[ChunkData]:
-    for chunk in sorted(project.chunks, key=lambda c: c.index):
+    for chunk in project.chunks:
         start = chunk.t_start_ms
         end = start + chunk.duration_ms
         if start <= timestamp_ms < end:
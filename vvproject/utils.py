@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import os
 import sys
 import types
@@ -7,6 +8,7 @@ from pathlib import Path
 from typing import Optional
 
 
+@functools.lru_cache(maxsize=1)
 def resolve_repo_root() -> Path:
     """Return the repository root (one level above this module)."""
     return Path(__file__).resolve().parents[1]
@@ -58,12 +60,30 @@ def ensure_folder_paths() -> types.ModuleType:
     return module
 
 
+@functools.lru_cache(maxsize=1)
+def _repo_root_str() -> str:
+    return str(resolve_repo_root())
+
+
 def expand_repo_placeholders(path_value: str) -> str:
     """Expand ``{repo}`` placeholder tokens in the supplied string."""
     if not path_value:
         return path_value
-    repo_root = resolve_repo_root()
-    return path_value.replace("{repo}", str(repo_root)).replace("${repo}", str(repo_root))
+    if "{repo}" not in path_value:
+        return path_value
+    repo_root = _repo_root_str()
+    return path_value.replace("{repo}", repo_root).replace("${repo}", repo_root)
+
+
+@functools.lru_cache(maxsize=32)
+def _read_text_cached(path: str, mtime_ns: int, size: int) -> str:
+    # mtime_ns/size are part of the cache key so an edited file is re-read.
+    return Path(path).read_text(encoding="utf-8")
+
+
+def _read_text(path: Path) -> str:
+    stat = path.stat()
+    return _read_text_cached(str(path), stat.st_mtime_ns, stat.st_size)
 
 
 def load_script_text(script_path: Optional[str], override_text: Optional[str] = None) -> str:
@@ -75,10 +95,10 @@ def load_script_text(script_path: Optional[str], override_text: Optional[str] =
         expanded = expand_repo_placeholders(script_path)
         candidate = Path(expanded)
         if candidate.is_file():
-            return candidate.read_text(encoding="utf-8")
+            return _read_text(candidate)
 
     default_script = resolve_repo_root() / "examples" / "sample_script.txt"
-    return default_script.read_text(encoding="utf-8")
+    return _read_text(default_script)
 
 
 def is_mock_mode() -> bool: